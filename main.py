@@ -13,14 +13,35 @@ Example:
 """
 
 import argparse
+import asyncio
+import functools
+import gzip
 import logging
+import re
+import sqlite3
 import sys
+import threading
 import time
-from collections import Counter, defaultdict
-from typing import Dict, List, Set
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Set, Tuple, Union
 from urllib.parse import urljoin, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import LocationParseError
+from urllib3.util import parse_url
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is optional; the crawler falls back to requests
+    aiohttp = None
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:  # selectolax is optional; the crawler falls back to regex
+    HTMLParser = None
 
 # Configure logging
 logging.basicConfig(
@@ -28,9 +49,111 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "MMX-Site-Crawler/1.0"
+
+# Compiled once at import so extract_links does not pay for pattern
+# compilation (or re's cache lookup) on every page. Bytes mode so pages
+# can be scanned without decoding the whole document first.
+_HREF_RE = re.compile(rb'href=["\']([^"\']+)["\']', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=8192)
+def _canonicalize(url: str) -> Tuple[str, str, str]:
+    """Split a URL once and return (scheme, netloc, path).
+
+    Results are memoized because the same URLs appear on page after
+    page. Parsing uses urllib3's parse_url, which is lighter than the
+    stdlib parser on this per-link hot path. Callers rebuild the clean
+    URL (fragments and query params dropped) from the parts; same-origin
+    links reuse the crawler's precomputed prefix instead of
+    reformatting scheme and host per link.
+    """
+    try:
+        parsed = parse_url(url)
+    except LocationParseError:
+        return "", "", ""
+
+    return parsed.scheme or "", parsed.netloc or "", parsed.path or ""
+
+
+# Common non-content file types and paths to skip while crawling
+_SKIP_EXTENSIONS = (
+    ".pdf",
+    ".zip",
+    ".exe",
+    ".dmg",
+    ".pkg",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".svg",
+    ".ico",
+    ".css",
+    ".js",
+    ".xml",
+)
+_SKIP_PATHS = ("/api/", "/admin/", "/wp-admin/", "/cgi-bin/", "/mail/")
+
+# One compiled alternation so the skip-path check is a single C-level
+# scan of the path instead of a Python loop of substring searches
+_SKIP_PATH_RE = re.compile("|".join(re.escape(skip_path) for skip_path in _SKIP_PATHS))
+
+
+def _is_valid_parts(scheme: str, netloc: str, path: str, domain: str) -> bool:
+    """Check an already-split URL without re-parsing it."""
+    # Only crawl same domain
+    if netloc != domain:
+        return False
+
+    # Skip non-HTTP/HTTPS protocols
+    if scheme not in ("http", "https"):
+        return False
+
+    path = path.lower()
+
+    # Skip common non-content file types (endswith on a tuple is a
+    # single C-level call)
+    if path.endswith(_SKIP_EXTENSIONS):
+        return False
+
+    # Skip common non-content paths
+    if _SKIP_PATH_RE.search(path):
+        return False
+
+    return True
+
+
+@functools.lru_cache(maxsize=65536)
+def _is_valid(url: str, domain: str) -> bool:
+    """Cached URL validation; the same links recur on page after page."""
+    scheme, netloc, path = _canonicalize(url)
+    return _is_valid_parts(scheme, netloc, path, domain)
+
 
 class SiteCrawler:
-    def __init__(self, base_url: str, max_depth: int = 3, delay: float = 1.0):
+    # Cap on how much of a response body is read for link extraction
+    MAX_CONTENT_BYTES = 2 * 1024 * 1024
+
+    # Report descriptions for exact status codes; anything else is
+    # classified by range in _describe_status
+    _STATUS_DESCRIPTIONS = {0: "FAILED", 200: "OK"}
+
+    # Path suffixes that are safe to GET without a HEAD probe first
+    _HTML_SUFFIXES = ("/", ".html", ".htm", ".php", ".asp", ".aspx")
+
+    def __init__(
+        self,
+        base_url: str,
+        max_depth: int = 3,
+        delay: float = 1.0,
+        concurrency: int = 1,
+        state_db: str = None,
+        head_probe: bool = False,
+        session: requests.Session = None,
+        timeout: Union[float, Tuple[float, float]] = 30,
+        follow_redirects: bool = True,
+    ):
         """
         Initialize the crawler.
 
@@ -38,102 +161,285 @@ class SiteCrawler:
             base_url: The starting URL for the crawl
             max_depth: Maximum depth to crawl (default: 3)
             delay: Delay between requests in seconds (default: 1.0)
+            concurrency: Number of requests to keep in flight (default: 1).
+                Values above 1 use the asyncio/aiohttp engine when aiohttp
+                is installed.
+            state_db: Path to a sqlite database that mirrors crawl state
+                to disk, so an interrupted crawl can resume (default: None,
+                in-memory only)
+            head_probe: Issue a HEAD request before fetching URLs whose
+                extension does not identify them as HTML, and skip them
+                when the headers say non-HTML or oversized (default: False)
+            session: A requests.Session to use instead of creating one,
+                so several crawlers (or a test suite) can share a single
+                connection pool; the caller keeps ownership and is
+                responsible for closing it (default: None, own session)
+            timeout: Per-request timeout in seconds, either a single
+                number or a (connect, read) tuple, bounding how long a
+                slow or unreachable host can stall the crawl
+                (default: 30)
+            follow_redirects: Follow HTTP redirects and record the final
+                status, instead of recording the 3xx itself
+                (default: True)
         """
         self.base_url = base_url.rstrip("/")
-        self.domain = urlparse(base_url).netloc
+        # Lowercased to match parse_url, which normalizes the host case
+        # of every extracted link
+        self.domain = urlparse(base_url).netloc.lower()
+        # Shared prefix for every same-origin clean URL, so link cleanup
+        # is a single concatenation instead of an f-string per link
+        self._same_origin_prefix = f"{urlparse(base_url).scheme}://{self.domain}"
         self.max_depth = max_depth
         self.delay = delay
+        self.concurrency = max(1, concurrency)
+        self.state_db = state_db
+        self.head_probe = head_probe
+        self.timeout = timeout
+        self.follow_redirects = follow_redirects
 
         # Crawl state
+        self._frontier: deque = deque()
         self.visited_urls: Set[str] = set()
+        self._rejected_urls: Set[str] = set()
         self.url_status: Dict[str, int] = {}
         self.url_depth: Dict[str, int] = {}
-        self.error_urls: Dict[int, List[str]] = defaultdict(list)
+
+        # Error buckets, with the common codes preallocated; the sorted
+        # key list is cached between report generations
+        self.error_urls: Dict[int, List[str]] = {0: [], 404: [], 500: []}
+        self._sorted_error_codes: List[int] = None
+
+        # Per-host politeness pacing (token bucket keyed by host)
+        self._next_ok: Dict[str, float] = defaultdict(float)
+        self._pace_lock = threading.Lock()
+
+        # Guards error bookkeeping when pages are fetched from threads
+        self._state_lock = threading.Lock()
+
+        # Optional on-disk mirror of crawl state for crash-safe resumes
+        self._db = None
+        self._pending_rows = 0
+        self._pending_frontier: List[Tuple[str, int]] = []
+        if state_db:
+            self._db = sqlite3.connect(state_db, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pages "
+                "(url TEXT PRIMARY KEY, status INTEGER, depth INTEGER)"
+            )
+            # Enqueued-but-uncrawled links, so a resume can pick up the
+            # children of pages that were already crawled
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pending "
+                "(url TEXT PRIMARY KEY, depth INTEGER)"
+            )
+            self._db.commit()
+            self._load_state()
 
         # Statistics
         self.total_requests = 0
         self.start_time = time.time()
 
-        # Session for requests
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "MMX-Site-Crawler/1.0"})
+        # Session for requests, with a pool large enough to keep
+        # connections alive across the whole crawl and a small retry
+        # budget for transient server errors. A caller-provided session
+        # is used as-is so its pool, adapters, and headers stay shared.
+        if session is not None:
+            self.session = session
+        else:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=64,
+                max_retries=Retry(
+                    total=2,
+                    backoff_factor=0.3,
+                    status_forcelist=[500, 502, 503, 504],
+                    # Hand back the final response instead of raising
+                    # RetryError, so persistent 5xx pages keep their
+                    # real status in the report
+                    raise_on_status=False,
+                ),
+            )
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+            self.session.headers.update(
+                {
+                    "User-Agent": USER_AGENT,
+                    "Accept-Encoding": "gzip, deflate, br",
+                }
+            )
 
     def is_valid_url(self, url: str) -> bool:
         """Check if URL should be crawled."""
-        parsed = urlparse(url)
+        return _is_valid(url, self.domain)
 
-        # Only crawl same domain
-        if parsed.netloc != self.domain:
-            return False
+    def extract_links(
+        self, html_content: Union[bytes, str], current_url: str
+    ) -> Set[str]:
+        """Extract links from HTML content (bytes preferred, str accepted)."""
+        if isinstance(html_content, str):
+            html_content = html_content.encode("utf-8", errors="ignore")
 
-        # Skip non-HTTP/HTTPS protocols
-        if parsed.scheme not in ["http", "https"]:
-            return False
-
-        # Skip common non-content file types
-        skip_extensions = {
-            ".pdf",
-            ".zip",
-            ".exe",
-            ".dmg",
-            ".pkg",
-            ".jpg",
-            ".jpeg",
-            ".png",
-            ".gif",
-            ".svg",
-            ".ico",
-            ".css",
-            ".js",
-            ".xml",
-        }
-        if any(parsed.path.lower().endswith(ext) for ext in skip_extensions):
-            return False
-
-        # Skip common non-content paths
-        skip_paths = ["/api/", "/admin/", "/wp-admin/", "/cgi-bin/", "/mail/"]
-        if any(skip_path in parsed.path.lower() for skip_path in skip_paths):
-            return False
+        links = set()
 
-        return True
+        if HTMLParser is not None:
+            # Parse with selectolax's C-level HTML parser, which handles
+            # unquoted attributes, entities, and comments correctly
+            tree = HTMLParser(html_content)
+            matches = [node.attributes.get("href") for node in tree.css("a[href]")]
+        else:
+            # Simple regex to find href attributes; only the matched
+            # attribute values are decoded, never the whole document
+            matches = [
+                m.decode("utf-8", errors="ignore")
+                for m in _HREF_RE.findall(html_content)
+            ]
 
-    def extract_links(self, html_content: str, current_url: str) -> Set[str]:
-        """Extract links from HTML content."""
-        import re
+        # The same nav links repeat on most pages, so drop duplicates and
+        # already-known URLs before paying for urljoin/urlparse
+        seen_raw = set()
 
-        links = set()
+        for match in matches:
+            if not match or match in seen_raw:
+                continue
+            seen_raw.add(match)
 
-        # Simple regex to find href attributes
-        href_pattern = r'href=["\']([^"\']+)["\']'
-        matches = re.findall(href_pattern, html_content)
+            # Absolute hrefs may already be in their clean form
+            if match.startswith("http") and match in self.visited_urls:
+                continue
 
-        for match in matches:
             # Convert relative URLs to absolute
             absolute_url = urljoin(current_url, match)
 
-            # Clean up URL (remove fragments, query params for crawling)
-            parsed = urlparse(absolute_url)
-            clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+            if absolute_url in self._rejected_urls:
+                continue
+
+            scheme, netloc, path = _canonicalize(absolute_url)
+
+            # Cross-domain links are rejected anyway, so skip them before
+            # building a clean URL at all
+            if netloc != self.domain:
+                self._rejected_urls.add(absolute_url)
+                continue
+
+            # Non-HTTP(S) schemes can share a host and path with real
+            # pages, so reject them by their raw form; caching the clean
+            # form here would suppress a legitimate link to the same path
+            if scheme not in ("http", "https"):
+                self._rejected_urls.add(absolute_url)
+                continue
+
+            # Same-origin clean URL: one concatenation against the
+            # precomputed prefix instead of an f-string per link
+            clean_url = self._same_origin_prefix + path
 
-            if self.is_valid_url(clean_url):
+            if clean_url in self.visited_urls or clean_url in self._rejected_urls:
+                continue
+
+            if _is_valid_parts(scheme, netloc, path, self.domain):
                 links.add(clean_url)
+            else:
+                self._rejected_urls.add(clean_url)
 
         return links
 
-    def crawl_page(self, url: str, depth: int = 0) -> None:
-        """Crawl a single page and extract links."""
-        if depth > self.max_depth or url in self.visited_urls:
-            return
+    def _reserve_slot(self, url: str) -> float:
+        """Reserve the next fetch slot for the URL's host.
+
+        Returns how long the caller must wait before fetching so that
+        requests to the same host stay `delay` seconds apart. Other
+        hosts are never blocked by this one.
+        """
+        if not self.delay:
+            return 0.0
+
+        host = _canonicalize(url)[1]
+        with self._pace_lock:
+            now = time.monotonic()
+            ready_at = max(self._next_ok[host], now)
+            self._next_ok[host] = ready_at + self.delay
+            return ready_at - now
+
+    def _count_request(self) -> None:
+        """Bump the request counter under the state lock.
+
+        The threaded engine calls this from worker threads, where the
+        bare read-modify-write would drop increments.
+        """
+        with self._state_lock:
+            self.total_requests += 1
+
+    def _probe_verdict(self, url: str, status_code: int, headers) -> bool:
+        """Classify a HEAD response: True when the GET should proceed."""
+        content_type = headers.get("Content-Type", "")
+        try:
+            content_length = int(headers.get("Content-Length", "0") or 0)
+        except (TypeError, ValueError):
+            content_length = 0  # Malformed header; let the GET decide
+
+        non_html = content_type and not content_type.startswith("text/html")
+        if non_html or content_length > self.MAX_CONTENT_BYTES:
+            self.url_status[url] = status_code
+            # Track errors like the GET path does, so skipped URLs stay
+            # consistent between the status summary and the error report
+            if status_code >= 400:
+                self._record_error(status_code, url)
+            return False
+
+        return True
+
+    def _probe_wanted(self, url: str) -> bool:
+        """Check whether a URL's extension leaves its content uncertain."""
+        path = _canonicalize(url)[2]
+        return bool(path) and not path.lower().endswith(self._HTML_SUFFIXES)
+
+    def _probe(self, url: str) -> bool:
+        """HEAD a URL to decide whether its body is worth fetching.
+
+        Returns True when the URL should still be fetched; request
+        failures also return True so the GET can report them properly.
+        """
+        try:
+            response = self.session.head(
+                url, timeout=self.timeout, allow_redirects=self.follow_redirects
+            )
+        except requests.exceptions.RequestException:
+            return True
+
+        self._count_request()
+
+        return self._probe_verdict(url, response.status_code, response.headers)
+
+    def crawl_page(self, url: str, depth: int = 0) -> Set[str]:
+        """Crawl a single page and return the extracted links."""
+        # Honor the per-host delay between requests
+        wait = self._reserve_slot(url)
+        if wait > 0:
+            time.sleep(wait)
 
         self.visited_urls.add(url)
         self.url_depth[url] = depth
 
         try:
-            logger.info(f"Crawling {url} (depth {depth})")
-
-            # Make request
-            response = self.session.get(url, timeout=30, allow_redirects=True)
-            self.total_requests += 1
+            # Probe uncertain URLs first so large binaries are never fetched
+            if self.head_probe and self._probe_wanted(url):
+                if not self._probe(url):
+                    logger.info("Skipping non-HTML content at %s", url)
+                    self._persist(url)
+                    return set()
+
+            logger.info("Crawling %s (depth %d)", url, depth)
+
+            # Make request; stream so non-HTML bodies are never downloaded
+            response = self.session.get(
+                url,
+                timeout=self.timeout,
+                stream=True,
+                allow_redirects=self.follow_redirects,
+            )
+            self._count_request()
 
             # Record status
             status_code = response.status_code
@@ -141,53 +447,347 @@ class SiteCrawler:
 
             # Track errors
             if status_code >= 400:
-                self.error_urls[status_code].append(url)
-                logger.warning(f"HTTP {status_code} for {url}")
+                self._record_error(status_code, url)
+                logger.warning("HTTP %d for %s", status_code, url)
 
             # Extract links for further crawling
+            links: Set[str] = set()
             if status_code == 200 and depth < self.max_depth:
-                try:
-                    links = self.extract_links(response.text, url)
-                    for link in links:
-                        if link not in self.visited_urls:
-                            # Add delay between requests
-                            time.sleep(self.delay)
-                            self.crawl_page(link, depth + 1)
-                except Exception as e:
-                    logger.error(f"Error extracting links from {url}: {e}")
+                content_type = response.headers.get("Content-Type", "")
+                if content_type.startswith("text/html"):
+                    # Read at most MAX_CONTENT_BYTES and scan the raw
+                    # bytes directly; no whole-document decode
+                    raw = response.raw.read(self.MAX_CONTENT_BYTES, decode_content=True)
+                    try:
+                        links = self.extract_links(raw, url)
+                    except Exception as e:
+                        logger.error("Error extracting links from %s: %s", url, e)
+
+            response.close()
+            self._persist(url)
+            return links
 
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for {url}: {e}")
+            logger.error("Request failed for %s: %s", url, e)
             self.url_status[url] = 0  # Mark as failed
-            self.error_urls[0].append(url)
+            self._record_error(0, url)
 
         except Exception as e:
-            logger.error(f"Unexpected error crawling {url}: {e}")
+            logger.error("Unexpected error crawling %s: %s", url, e)
             self.url_status[url] = 0  # Mark as failed
-            self.error_urls[0].append(url)
+            self._record_error(0, url)
+
+        self._persist(url)
+        return set()
+
+    def _load_state(self) -> None:
+        """Restore crawl state recorded by a previous run."""
+        rows = self._db.execute("SELECT url, status, depth FROM pages")
+        for url, status, depth in rows:
+            self.visited_urls.add(url)
+            self.url_status[url] = status
+            self.url_depth[url] = depth
+            if status == 0 or status >= 400:
+                self._record_error(status, url)
+
+        # Links that were discovered but not yet crawled; stale rows for
+        # pages crawled after the last batch commit are filtered out
+        rows = self._db.execute("SELECT url, depth FROM pending")
+        self._pending_frontier = [
+            (url, depth) for url, depth in rows if url not in self.visited_urls
+        ]
+
+        if self.visited_urls:
+            logger.info("Resuming crawl with %d known pages", len(self.visited_urls))
+
+    def _seed_frontier(self) -> List[Tuple[str, int]]:
+        """Return the (url, depth) pairs the crawl should start from.
+
+        A fresh crawl starts at the base URL; a resumed crawl starts
+        from the pending links recorded by the previous run. Seeds are
+        marked visited here, matching the enqueue-time dedupe the crawl
+        engines use. Already-crawled pages are never re-fetched, so
+        their loaded error entries are not double-counted.
+        """
+        seeds = []
+        if self.base_url not in self.visited_urls:
+            self.visited_urls.add(self.base_url)
+            seeds.append((self.base_url, 0))
+        seeds.extend(self._pending_frontier)
+        return seeds
+
+    def _persist(self, url: str) -> None:
+        """Mirror one crawled page to the state database, if configured."""
+        if self._db is None:
+            return
+
+        with self._state_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?)",
+                (url, self.url_status.get(url, 0), self.url_depth.get(url, 0)),
+            )
+            self._db.execute("DELETE FROM pending WHERE url = ?", (url,))
+            self._pending_rows += 1
+            # Batch commits so each page is not its own fsync
+            if self._pending_rows >= 100:
+                self._db.commit()
+                self._pending_rows = 0
+
+    def _persist_pending(self, url: str, depth: int) -> None:
+        """Record an enqueued-but-uncrawled link for resumes, if configured."""
+        if self._db is None:
+            return
+
+        with self._state_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pending VALUES (?, ?)", (url, depth)
+            )
+            self._pending_rows += 1
+            if self._pending_rows >= 100:
+                self._db.commit()
+                self._pending_rows = 0
+
+    def _record_error(self, status_code: int, url: str) -> None:
+        """Record a failed URL under its status bucket."""
+        with self._state_lock:
+            self.error_urls.setdefault(status_code, []).append(url)
+            self._sorted_error_codes = None
+
+    def _error_codes(self) -> List[int]:
+        """Return the non-empty error codes in sorted order (cached)."""
+        if self._sorted_error_codes is None:
+            self._sorted_error_codes = sorted(
+                code for code, urls in self.error_urls.items() if urls
+            )
+        return self._sorted_error_codes
+
+    def _flush_state(self) -> None:
+        """Commit any batched state rows to disk."""
+        if self._db is not None:
+            with self._state_lock:
+                self._db.commit()
+                self._pending_rows = 0
+
+    def _crawl_threaded(self) -> None:
+        """Crawl breadth-first, fetching each level with a thread pool.
+
+        requests releases the GIL during socket reads, so a pool of
+        blocking fetchers overlaps network latency much like the async
+        engine. Link merging and scheduling stay on the main thread, so
+        the visited set is only ever mutated from one place.
+        """
+        level = self._seed_frontier()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while level:
+                futures = {
+                    executor.submit(self.crawl_page, url, depth): (url, depth)
+                    for url, depth in level
+                }
+
+                next_level = []
+                for future in as_completed(futures):
+                    depth = futures[future][1]
+                    for link in future.result():
+                        if link not in self.visited_urls and depth < self.max_depth:
+                            self.visited_urls.add(link)
+                            self._persist_pending(link, depth + 1)
+                            next_level.append((link, depth + 1))
+
+                level = next_level
+
+    def _crawl_sync(self) -> None:
+        """Crawl iteratively with a breadth-first queue of (url, depth) pairs."""
+        self._frontier = deque(self._seed_frontier())
+
+        while self._frontier:
+            url, depth = self._frontier.popleft()
+
+            links = self.crawl_page(url, depth)
+
+            # Deduplicate at enqueue time so a URL is never scheduled twice
+            for link in links:
+                if link not in self.visited_urls and depth + 1 <= self.max_depth:
+                    self.visited_urls.add(link)
+                    self._persist_pending(link, depth + 1)
+                    self._frontier.append((link, depth + 1))
+
+    async def _probe_async(self, session: "aiohttp.ClientSession", url: str) -> bool:
+        """Async twin of _probe for the aiohttp engine."""
+        try:
+            async with session.head(
+                url, allow_redirects=self.follow_redirects
+            ) as response:
+                self._count_request()
+                return self._probe_verdict(url, response.status, response.headers)
+        except aiohttp.ClientError:
+            return True
+
+    async def _crawl_page_async(
+        self, session: "aiohttp.ClientSession", url: str, depth: int
+    ) -> Set[str]:
+        """Fetch a single page with aiohttp and return the extracted links."""
+        self.url_depth[url] = depth
+
+        try:
+            # Probe uncertain URLs first so large binaries are never fetched
+            if self.head_probe and self._probe_wanted(url):
+                if not await self._probe_async(session, url):
+                    logger.info("Skipping non-HTML content at %s", url)
+                    self._persist(url)
+                    return set()
+
+            logger.info("Crawling %s (depth %d)", url, depth)
+
+            async with session.get(
+                url, allow_redirects=self.follow_redirects
+            ) as response:
+                self._count_request()
+
+                status_code = response.status
+                self.url_status[url] = status_code
+
+                if status_code >= 400:
+                    self._record_error(status_code, url)
+                    logger.warning("HTTP %d for %s", status_code, url)
+
+                is_html = response.content_type == "text/html"
+                if status_code == 200 and depth < self.max_depth and is_html:
+                    raw = await response.content.read(self.MAX_CONTENT_BYTES)
+                    try:
+                        links = self.extract_links(raw, url)
+                        self._persist(url)
+                        return links
+                    except Exception as e:
+                        logger.error("Error extracting links from %s: %s", url, e)
+
+        except asyncio.TimeoutError:
+            logger.error("Request timed out for %s", url)
+            self.url_status[url] = 0  # Mark as failed
+            self._record_error(0, url)
+
+        except aiohttp.ClientError as e:
+            logger.error("Request failed for %s: %s", url, e)
+            self.url_status[url] = 0  # Mark as failed
+            self._record_error(0, url)
+
+        except Exception as e:
+            logger.error("Unexpected error crawling %s: %s", url, e)
+            self.url_status[url] = 0  # Mark as failed
+            self._record_error(0, url)
+
+        self._persist(url)
+        return set()
+
+    async def _worker(
+        self,
+        queue: "asyncio.Queue",
+        session: "aiohttp.ClientSession",
+        semaphore: "asyncio.Semaphore",
+    ) -> None:
+        """Pull URLs off the queue until the crawl is drained."""
+        while True:
+            url, depth = await queue.get()
+
+            try:
+                async with semaphore:
+                    # Honor the per-host delay between requests
+                    wait = self._reserve_slot(url)
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+
+                    links = await self._crawl_page_async(session, url, depth)
+
+                for link in links:
+                    if link not in self.visited_urls:
+                        self.visited_urls.add(link)
+                        self._persist_pending(link, depth + 1)
+                        queue.put_nowait((link, depth + 1))
+            finally:
+                queue.task_done()
+
+    async def _crawl_async(self) -> None:
+        """Crawl concurrently with a queue of pending URLs and worker coroutines."""
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        for url, depth in self._seed_frontier():
+            queue.put_nowait((url, depth))
+
+        connector = aiohttp.TCPConnector(
+            limit=200, limit_per_host=32, ttl_dns_cache=300
+        )
+        # aiohttp takes one total budget; collapse a (connect, read)
+        # tuple into its sum
+        total = sum(self.timeout) if isinstance(self.timeout, tuple) else self.timeout
+        timeout = aiohttp.ClientTimeout(total=total)
+
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={"User-Agent": USER_AGENT},
+        ) as session:
+            workers = [
+                asyncio.create_task(self._worker(queue, session, semaphore))
+                for _ in range(self.concurrency)
+            ]
+
+            await queue.join()
+
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
     def crawl(self) -> None:
         """Start the crawling process."""
-        logger.info(f"Starting crawl of {self.base_url}")
-        logger.info(f"Max depth: {self.max_depth}, Delay: {self.delay}s")
+        logger.info("Starting crawl of %s", self.base_url)
+        logger.info("Max depth: %d, Delay: %ss", self.max_depth, self.delay)
 
-        self.crawl_page(self.base_url, 0)
+        try:
+            if self.concurrency > 1 and aiohttp is not None:
+                logger.info("Using async engine with %d workers", self.concurrency)
+                asyncio.run(self._crawl_async())
+            elif self.concurrency > 1:
+                logger.info("Using thread pool with %d workers", self.concurrency)
+                self._crawl_threaded()
+            else:
+                self._crawl_sync()
+        finally:
+            self._flush_state()
 
         logger.info("Crawling completed!")
 
+    def _describe_status(self, status_code: int) -> str:
+        """Describe a status code for reporting."""
+        default = "ERROR" if status_code >= 400 else "OTHER"
+        return self._STATUS_DESCRIPTIONS.get(status_code, default)
+
     def generate_report(self, is_partial: bool = False) -> str:
         """Generate a comprehensive crawl report."""
+        return "".join(self.iter_report_lines(is_partial=is_partial))
+
+    def iter_report_lines(self, is_partial: bool = False):
+        """Yield the crawl report chunk by chunk.
+
+        Streaming keeps peak memory at O(chunk) when the report is being
+        written straight to a file; generate_report joins the chunks for
+        callers that want the whole string.
+        """
         end_time = time.time()
         duration = end_time - self.start_time
 
         # Count status codes
         status_counts = Counter(self.url_status.values())
 
-        # Generate report
-        report = []
-        report.append(f"# Site Crawler Report: {self.base_url}\n")
+        # Bucket URLs by depth in a single pass
+        depth_buckets: Dict[int, List[str]] = defaultdict(list)
+        for url, depth in self.url_depth.items():
+            depth_buckets[depth].append(url)
+        max_depth_reached = max(self.url_depth.values(), default=0)
+
+        yield f"# Site Crawler Report: {self.base_url}\n\n"
         if is_partial:
-            report.append("⚠️ **PARTIAL REPORT** - Crawling was interrupted\n")
+            yield "⚠️ **PARTIAL REPORT** - Crawling was interrupted\n\n"
 
         # Create properly aligned table
         metrics = [
@@ -200,70 +800,56 @@ class SiteCrawler:
             ("Duration", f"{duration:.2f} seconds"),
             ("Total Requests", str(self.total_requests)),
             ("Total Pages Visited", str(len(self.visited_urls))),
-            (
-                "Max Depth Reached",
-                str(max(self.url_depth.values()) if self.url_depth else 0),
-            ),
+            ("Max Depth Reached", str(max_depth_reached)),
         ]
 
         # Find the maximum width for the metric column
         max_metric_width = max(len(metric) for metric, _ in metrics)
 
         # Create the table header
-        report.append(f"| {'Metric':<{max_metric_width}} | Value |")
-        report.append(f"|{'-' * max_metric_width}-|--------|")
+        yield f"| {'Metric':<{max_metric_width}} | Value |\n"
+        yield f"|{'-' * max_metric_width}-|--------|\n"
 
         # Add each metric row
         for metric, value in metrics:
-            report.append(f"| {metric:<{max_metric_width}} | {value} |")
+            yield f"| {metric:<{max_metric_width}} | {value} |\n"
 
-        report.append("")
+        yield "\n"
 
         # Status code summary
-        report.append("## HTTP STATUS CODE SUMMARY\n")
-        report.append("| Status Code | Description | Count |")
-        report.append("|-------------|-------------|-------|")
+        yield "## HTTP STATUS CODE SUMMARY\n\n"
+        yield "| Status Code | Description | Count |\n"
+        yield "|-------------|-------------|-------|\n"
         for status_code in sorted(status_counts.keys()):
             count = status_counts[status_code]
-            if status_code == 0:
-                status_desc = "FAILED"
-            elif status_code == 200:
-                status_desc = "OK"
-            elif status_code >= 400:
-                status_desc = "ERROR"
-            else:
-                status_desc = "OTHER"
-
-            report.append(f"| {status_code} | {status_desc} | {count} |")
-        report.append("")
+            status_desc = self._describe_status(status_code)
+            yield f"| {status_code} | {status_desc} | {count} |\n"
+        yield "\n"
 
         # Error details
-        if self.error_urls:
-            report.append("## DETAILED ERROR REPORT\n")
+        if self._error_codes():
+            yield "## DETAILED ERROR REPORT\n\n"
 
-            for status_code in sorted(self.error_urls.keys()):
+            for status_code in self._error_codes():
                 if status_code == 0:
-                    report.append("### FAILED REQUESTS\n")
+                    yield "### FAILED REQUESTS\n\n"
                 else:
-                    report.append(f"#### HTTP {status_code} ERRORS\n")
+                    yield f"#### HTTP {status_code} ERRORS\n\n"
 
                 for url in self.error_urls[status_code]:
-                    report.append(f"- {url}")
-                report.append("")
+                    yield f"- {url}\n"
+                yield "\n"
 
         # All visited URLs by depth
-        report.append("## ALL VISITED PAGES BY DEPTH\n")
-
-        for depth in range(max(self.url_depth.values()) + 1 if self.url_depth else 0):
-            urls_at_depth = [url for url, d in self.url_depth.items() if d == depth]
-            if urls_at_depth:
-                report.append(f"### Depth {depth} ({len(urls_at_depth)} pages)\n")
-                for url in sorted(urls_at_depth):
-                    status = self.url_status.get(url, "Unknown")
-                    report.append(f"- [{status}] {url}")
-                report.append("")
+        yield "## ALL VISITED PAGES BY DEPTH\n\n"
 
-        return "\n".join(report)
+        for depth in sorted(depth_buckets):
+            urls_at_depth = depth_buckets[depth]
+            yield f"### Depth {depth} ({len(urls_at_depth)} pages)\n\n"
+            for url in sorted(urls_at_depth):
+                status = self.url_status.get(url, "Unknown")
+                yield f"- [{status}] {url}\n"
+            yield "\n"
 
 
 def main():
@@ -294,6 +880,26 @@ Examples:
         help="Delay between requests in seconds (default: 1.0)",
     )
 
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of concurrent requests; values above 1 use aiohttp (default: 1)",
+    )
+
+    parser.add_argument(
+        "--head-probe",
+        action="store_true",
+        help="Send a HEAD request before fetching URLs with unknown "
+        "extensions and skip non-HTML or oversized content",
+    )
+
+    parser.add_argument(
+        "--state-db",
+        help="Sqlite file for crawl state; reusing it resumes a crawl "
+        "(default: in-memory only)",
+    )
+
     parser.add_argument(
         "--output", help="Output file for the report (default: print to console)"
     )
@@ -305,7 +911,14 @@ Examples:
         args.url = "https://" + args.url
 
     # Create crawler instance
-    crawler = SiteCrawler(base_url=args.url, max_depth=args.max_depth, delay=args.delay)
+    crawler = SiteCrawler(
+        base_url=args.url,
+        max_depth=args.max_depth,
+        delay=args.delay,
+        concurrency=args.concurrency,
+        state_db=args.state_db,
+        head_probe=args.head_probe,
+    )
 
     crawling_interrupted = False
 
@@ -318,15 +931,26 @@ Examples:
         print("Generating partial report...")
         crawling_interrupted = True
     except Exception as e:
-        logger.error(f"Fatal error during crawling: {e}")
+        logger.error("Fatal error during crawling: %s", e)
         print("Generating partial report...")
         crawling_interrupted = True
 
     # Generate and output report (even if crawling was interrupted)
     try:
-        report = crawler.generate_report(is_partial=crawling_interrupted)
-
-        if args.output:
+        if args.output and args.output.endswith(".gz"):
+            # Stream the report straight into a gzip file; large crawls
+            # never materialize the whole report in memory
+            try:
+                with gzip.open(args.output, "wt", encoding="utf-8") as f:
+                    f.writelines(
+                        crawler.iter_report_lines(is_partial=crawling_interrupted)
+                    )
+                print(f"Report saved to {args.output}")
+            except IOError as e:
+                print(f"Error writing to {args.output}: {e}")
+                print("\n" + crawler.generate_report(is_partial=crawling_interrupted))
+        elif args.output:
+            report = crawler.generate_report(is_partial=crawling_interrupted)
             try:
                 with open(args.output, "w") as f:
                     f.write(report)
@@ -335,10 +959,10 @@ Examples:
                 print(f"Error writing to {args.output}: {e}")
                 print("\n" + report)
         else:
-            print(report)
+            print(crawler.generate_report(is_partial=crawling_interrupted))
 
     except Exception as e:
-        logger.error(f"Error generating report: {e}")
+        logger.error("Error generating report: %s", e)
         sys.exit(1)
 
 
@@ -2,12 +2,26 @@
 Unit tests for Site Crawler
 """
 
+import os
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 
+import requests
+
 from main import SiteCrawler, main
 
 
+def mock_html_response(html="", status_code=200):
+    """Build a mock streaming response like the ones crawl_page reads."""
+    mock_response = Mock()
+    mock_response.status_code = status_code
+    mock_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+    mock_response.encoding = "utf-8"
+    mock_response.raw.read.return_value = html.encode("utf-8")
+    return mock_response
+
+
 class TestSiteCrawler(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures before each test method."""
@@ -24,12 +38,34 @@ class TestSiteCrawler(unittest.TestCase):
         self.assertEqual(crawler.delay, 2.0)
         self.assertEqual(len(crawler.visited_urls), 0)
         self.assertEqual(len(crawler.url_status), 0)
+        self.assertEqual(crawler.timeout, 30)
+        self.assertTrue(crawler.follow_redirects)
 
     def test_init_with_trailing_slash(self):
         """Test initialization with trailing slash in URL."""
         crawler = SiteCrawler("https://example.com/", max_depth=3)
         self.assertEqual(crawler.base_url, "https://example.com")
 
+    def test_init_with_uppercase_host(self):
+        """Test that a mixed-case base host still matches its links."""
+        crawler = SiteCrawler("https://Example.COM")
+
+        self.assertEqual(crawler.domain, "example.com")
+
+        links = crawler.extract_links(
+            '<a href="/page1">Page 1</a>', "https://example.com/"
+        )
+        self.assertEqual(links, {"https://example.com/page1"})
+
+    def test_init_with_shared_session(self):
+        """Test that a caller-provided session is used as-is."""
+        session = requests.Session()
+        try:
+            crawler = SiteCrawler("https://example.com", session=session)
+            self.assertIs(crawler.session, session)
+        finally:
+            session.close()
+
     def test_is_valid_url_same_domain(self):
         """Test URL validation for same domain URLs."""
         valid_urls = [
@@ -120,6 +156,43 @@ class TestSiteCrawler(unittest.TestCase):
 
         self.assertEqual(links, expected_links)
 
+    def test_extract_links_bytes_content(self):
+        """Test link extraction directly from undecoded bytes."""
+        html_content = b'<a href="/page1">Page 1</a><a href="/page2">Page 2</a>'
+
+        links = self.crawler.extract_links(html_content, "https://example.com/")
+
+        expected_links = {
+            "https://example.com/page1",
+            "https://example.com/page2",
+        }
+
+        self.assertEqual(links, expected_links)
+
+        # The regex fallback should handle bytes the same way
+        with patch("main.HTMLParser", None):
+            links = self.crawler.extract_links(html_content, "https://example.com/")
+
+        self.assertEqual(links, expected_links)
+
+    def test_extract_links_regex_fallback(self):
+        """Test link extraction falls back to regex without selectolax."""
+        html_content = """
+        <a href="/page1">Page 1</a>
+        <a href="https://example.com/page2">Page 2</a>
+        <a href="https://other.com/external">External</a>
+        """
+
+        with patch("main.HTMLParser", None):
+            links = self.crawler.extract_links(html_content, "https://example.com/")
+
+        expected_links = {
+            "https://example.com/page1",
+            "https://example.com/page2",
+        }
+
+        self.assertEqual(links, expected_links)
+
     def test_extract_links_with_relative_urls(self):
         """Test link extraction with relative URLs."""
         html_content = """
@@ -138,6 +211,20 @@ class TestSiteCrawler(unittest.TestCase):
 
         self.assertEqual(links, expected_links)
 
+    def test_extract_links_same_host_other_scheme(self):
+        """Test that a non-HTTP link does not shadow an HTTPS twin."""
+        # The ftp link shares its host and path with a real page; it
+        # must not poison the rejected-URL cache for the https form
+        links = self.crawler.extract_links(
+            '<a href="ftp://example.com/file">FTP</a>', "https://example.com/"
+        )
+        self.assertEqual(links, set())
+
+        links = self.crawler.extract_links(
+            '<a href="https://example.com/file">File</a>', "https://example.com/"
+        )
+        self.assertEqual(links, {"https://example.com/file"})
+
     def test_extract_links_empty_content(self):
         """Test link extraction from empty HTML content."""
         links = self.crawler.extract_links("", "https://example.com/")
@@ -153,9 +240,7 @@ class TestSiteCrawler(unittest.TestCase):
     def test_crawl_page_success(self, mock_session):
         """Test successful page crawling."""
         # Mock response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = '<a href="/page1">Page 1</a>'
+        mock_response = mock_html_response('<a href="/page1">Page 1</a>')
 
         mock_session_instance = Mock()
         mock_session_instance.get.return_value = mock_response
@@ -172,6 +257,26 @@ class TestSiteCrawler(unittest.TestCase):
         self.assertEqual(crawler.url_status["https://example.com/"], 200)
         self.assertEqual(crawler.url_depth["https://example.com/"], 0)
 
+    @patch("main.requests.Session")
+    def test_crawl_page_skips_non_html(self, mock_session):
+        """Test that non-HTML responses are not read or parsed."""
+        mock_response = mock_html_response('<a href="/page1">Page 1</a>')
+        mock_response.headers = {"Content-Type": "application/json"}
+
+        mock_session_instance = Mock()
+        mock_session_instance.get.return_value = mock_response
+        mock_session.return_value = mock_session_instance
+
+        crawler = SiteCrawler("https://example.com", max_depth=1)
+        crawler.session = mock_session_instance
+
+        links = crawler.crawl_page("https://example.com/data", 0)
+
+        # The body should never be read and no links extracted
+        self.assertEqual(links, set())
+        mock_response.raw.read.assert_not_called()
+        self.assertEqual(crawler.url_status["https://example.com/data"], 200)
+
     @patch("main.requests.Session")
     def test_crawl_page_http_error(self, mock_session):
         """Test crawling page with HTTP error."""
@@ -212,34 +317,205 @@ class TestSiteCrawler(unittest.TestCase):
         self.assertEqual(crawler.url_status["https://example.com/failed"], 0)
         self.assertIn("https://example.com/failed", crawler.error_urls[0])
 
-    def test_crawl_page_depth_limit(self):
+    def test_crawl_depth_limit(self):
         """Test that crawling respects depth limit."""
-        crawler = SiteCrawler("https://example.com", max_depth=1)
+        crawler = SiteCrawler("https://example.com", max_depth=1, delay=0)
+
+        # Mock responses so every page links one level deeper
+        def mock_get(url, **kwargs):
+            if url == "https://example.com/deep":
+                return mock_html_response('<a href="/deeper">Deeper</a>')
+            return mock_html_response('<a href="/deep">Deep</a>')
 
-        # Mock the session to avoid actual requests
         crawler.session = Mock()
+        crawler.session.get.side_effect = mock_get
 
-        # Try to crawl beyond max depth
-        crawler.crawl_page("https://example.com/deep", 2)
+        crawler.crawl()
 
-        # Should not be visited due to depth limit
-        self.assertNotIn("https://example.com/deep", crawler.visited_urls)
+        # The page beyond max depth should never be scheduled
+        self.assertIn("https://example.com/deep", crawler.visited_urls)
+        self.assertNotIn("https://example.com/deeper", crawler.visited_urls)
 
-    def test_crawl_page_already_visited(self):
-        """Test that already visited URLs are skipped."""
-        crawler = SiteCrawler("https://example.com")
+    def test_crawl_already_visited(self):
+        """Test that already visited URLs are never scheduled twice."""
+        crawler = SiteCrawler("https://example.com", max_depth=3, delay=0)
+
+        # Mock responses where two pages link to each other
+        def mock_get(url, **kwargs):
+            if url == "https://example.com/page1":
+                return mock_html_response('<a href="/page2">Page 2</a>')
+            return mock_html_response('<a href="/page1">Page 1</a>')
 
-        # Mock the session to avoid actual requests
         crawler.session = Mock()
+        crawler.session.get.side_effect = mock_get
+
+        crawler.crawl()
+
+        # Each URL should only be requested once despite the link cycle
+        self.assertEqual(crawler.session.get.call_count, 3)
+
+    def test_head_probe_skips_non_html(self):
+        """Test that the HEAD probe skips non-HTML content without a GET."""
+        crawler = SiteCrawler(
+            "https://example.com", max_depth=1, delay=0, head_probe=True
+        )
 
-        # Mark URL as visited
-        crawler.visited_urls.add("https://example.com/visited")
+        mock_head_response = Mock()
+        mock_head_response.status_code = 200
+        mock_head_response.headers = {
+            "Content-Type": "application/pdf",
+            "Content-Length": "1024",
+        }
+
+        crawler.session = Mock()
+        crawler.session.head.return_value = mock_head_response
 
-        # Try to crawl the same URL again
-        crawler.crawl_page("https://example.com/visited", 0)
+        links = crawler.crawl_page("https://example.com/download/1234", 0)
 
-        # Should not make a request since it's already visited
+        # The probe should prevent the body from being fetched
+        self.assertEqual(links, set())
         crawler.session.get.assert_not_called()
+        self.assertIn("https://example.com/download/1234", crawler.visited_urls)
+
+    def test_head_probe_records_errors(self):
+        """Test that a skipped probe with an error status is tracked."""
+        crawler = SiteCrawler(
+            "https://example.com", max_depth=1, delay=0, head_probe=True
+        )
+
+        mock_head_response = Mock()
+        mock_head_response.status_code = 404
+        mock_head_response.headers = {"Content-Type": "application/pdf"}
+
+        crawler.session = Mock()
+        crawler.session.head.return_value = mock_head_response
+
+        crawler.crawl_page("https://example.com/download/1234", 0)
+
+        # The error must land in both the status map and the error list
+        self.assertEqual(crawler.url_status["https://example.com/download/1234"], 404)
+        self.assertIn("https://example.com/download/1234", crawler.error_urls[404])
+
+    def test_head_probe_malformed_content_length(self):
+        """Test that a malformed Content-Length header cannot kill the crawl."""
+        crawler = SiteCrawler(
+            "https://example.com", max_depth=1, delay=0, head_probe=True
+        )
+
+        mock_head_response = Mock()
+        mock_head_response.status_code = 200
+        mock_head_response.headers = {
+            "Content-Type": "text/html",
+            "Content-Length": "12abc",
+        }
+
+        crawler.session = Mock()
+        crawler.session.head.return_value = mock_head_response
+        crawler.session.get.return_value = mock_html_response(
+            '<a href="/page1">Page 1</a>'
+        )
+
+        # The unparseable header is treated as 0 and the GET proceeds
+        links = crawler.crawl_page("https://example.com/download/1234", 0)
+
+        self.assertEqual(links, {"https://example.com/page1"})
+        self.assertEqual(crawler.url_status["https://example.com/download/1234"], 200)
+
+    def test_head_probe_allows_html(self):
+        """Test that the HEAD probe lets HTML URLs through to the GET."""
+        crawler = SiteCrawler(
+            "https://example.com", max_depth=1, delay=0, head_probe=True
+        )
+
+        mock_head_response = Mock()
+        mock_head_response.status_code = 200
+        mock_head_response.headers = {"Content-Type": "text/html"}
+
+        crawler.session = Mock()
+        crawler.session.head.return_value = mock_head_response
+        crawler.session.get.return_value = mock_html_response(
+            '<a href="/page1">Page 1</a>'
+        )
+
+        links = crawler.crawl_page("https://example.com/download/1234", 0)
+
+        self.assertEqual(links, {"https://example.com/page1"})
+
+    def test_state_db_persistence_and_resume(self):
+        """Test that crawl state is persisted and restored via sqlite."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state_db = os.path.join(tmp_dir, "crawl.db")
+
+            crawler = SiteCrawler(
+                "https://example.com", max_depth=1, delay=0, state_db=state_db
+            )
+            crawler.session = Mock()
+            crawler.session.get.return_value = mock_html_response(
+                '<a href="/page1">Page 1</a>'
+            )
+
+            crawler.crawl()
+
+            # A new crawler pointed at the same database resumes the state
+            resumed = SiteCrawler(
+                "https://example.com", max_depth=1, delay=0, state_db=state_db
+            )
+
+            self.assertIn("https://example.com", resumed.visited_urls)
+            self.assertIn("https://example.com/page1", resumed.visited_urls)
+            self.assertEqual(resumed.url_status["https://example.com"], 200)
+            self.assertEqual(resumed.url_depth["https://example.com/page1"], 1)
+
+    def test_state_db_resumes_pending_frontier(self):
+        """Test that a resume picks up links discovered but not yet crawled."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state_db = os.path.join(tmp_dir, "crawl.db")
+
+            crawler = SiteCrawler(
+                "https://example.com", max_depth=2, delay=0, state_db=state_db
+            )
+            crawler.session = Mock()
+            crawler.session.get.return_value = mock_html_response(
+                '<a href="/page1">Page 1</a>'
+            )
+
+            # Simulate an interrupted crawl: the base page was crawled
+            # and /page1 was enqueued, but never fetched
+            crawler.visited_urls.add("https://example.com")
+            crawler.crawl_page("https://example.com", 0)
+            crawler._persist_pending("https://example.com/page1", 1)
+            crawler._flush_state()
+
+            resumed = SiteCrawler(
+                "https://example.com", max_depth=2, delay=0, state_db=state_db
+            )
+            resumed.session = Mock()
+            resumed.session.get.return_value = mock_html_response("")
+
+            resumed.crawl()
+
+            # The resumed crawl fetches only the pending child, without
+            # re-crawling the base page or double-counting its state
+            resumed.session.get.assert_called_once()
+            self.assertEqual(
+                resumed.session.get.call_args[0][0], "https://example.com/page1"
+            )
+            self.assertEqual(resumed.url_status["https://example.com/page1"], 200)
+            self.assertEqual(resumed.url_depth["https://example.com/page1"], 1)
+
+    def test_describe_status(self):
+        """Test status code descriptions."""
+        cases = [
+            (0, "FAILED"),
+            (200, "OK"),
+            (301, "OTHER"),
+            (404, "ERROR"),
+            (500, "ERROR"),
+        ]
+
+        for status_code, expected in cases:
+            with self.subTest(status_code=status_code):
+                self.assertEqual(self.crawler._describe_status(status_code), expected)
 
     def test_generate_report(self):
         """Test report generation."""
@@ -271,6 +547,19 @@ class TestSiteCrawler(unittest.TestCase):
         # Verify partial report indicator
         self.assertIn("PARTIAL REPORT", report)
 
+    def test_iter_report_lines_matches_generate_report(self):
+        """Test that the streaming report matches the joined report."""
+        crawler = SiteCrawler("https://example.com")
+
+        crawler.visited_urls.add("https://example.com/")
+        crawler.url_status["https://example.com/"] = 200
+        crawler.url_depth["https://example.com/"] = 0
+
+        report = crawler.generate_report()
+        streamed = "".join(crawler.iter_report_lines())
+
+        self.assertEqual(report, streamed)
+
     def test_generate_report_empty_crawl(self):
         """Test report generation with no pages visited."""
         crawler = SiteCrawler("https://example.com")
@@ -281,34 +570,28 @@ class TestSiteCrawler(unittest.TestCase):
         self.assertIn("Site Crawler Report: https://example.com", report)
         self.assertIn("Total Pages Visited | 0", report)
 
-    def test_crawl_recursive_behavior(self):
-        """Test recursive crawling behavior."""
-        crawler = SiteCrawler("https://example.com", max_depth=2)
+    def test_crawl_bfs_behavior(self):
+        """Test breadth-first crawling behavior."""
+        crawler = SiteCrawler("https://example.com", max_depth=2, delay=0)
 
         # Mock responses for different pages
         def mock_get(url, **kwargs):
-            mock_response = Mock()
-            if url == "https://example.com/":
-                mock_response.status_code = 200
-                mock_response.text = '<a href="/page1">Page 1</a>'
-            elif url == "https://example.com/page1":
-                mock_response.status_code = 200
-                mock_response.text = '<a href="/page2">Page 2</a>'
-            elif url == "https://example.com/page2":
-                mock_response.status_code = 200
-                mock_response.text = '<a href="/page3">Page 3</a>'
-            else:
-                mock_response.status_code = 404
-            return mock_response
+            if url == "https://example.com":
+                return mock_html_response('<a href="/page1">Page 1</a>')
+            if url == "https://example.com/page1":
+                return mock_html_response('<a href="/page2">Page 2</a>')
+            if url == "https://example.com/page2":
+                return mock_html_response('<a href="/page3">Page 3</a>')
+            return mock_html_response(status_code=404)
 
         crawler.session = Mock()
         crawler.session.get.side_effect = mock_get
 
         # Start crawling
-        crawler.crawl_page("https://example.com/", 0)
+        crawler.crawl()
 
         # Verify pages were visited at correct depths
-        self.assertIn("https://example.com/", crawler.visited_urls)
+        self.assertIn("https://example.com", crawler.visited_urls)
         self.assertIn("https://example.com/page1", crawler.visited_urls)
         self.assertIn("https://example.com/page2", crawler.visited_urls)
 
@@ -316,7 +599,7 @@ class TestSiteCrawler(unittest.TestCase):
         self.assertNotIn("https://example.com/page3", crawler.visited_urls)
 
         # Verify depths
-        self.assertEqual(crawler.url_depth["https://example.com/"], 0)
+        self.assertEqual(crawler.url_depth["https://example.com"], 0)
         self.assertEqual(crawler.url_depth["https://example.com/page1"], 1)
         self.assertEqual(crawler.url_depth["https://example.com/page2"], 2)
 
@@ -325,12 +608,53 @@ class TestSiteCrawler(unittest.TestCase):
         crawler = SiteCrawler("https://example.com")
 
         # Mock the crawl_page method to avoid actual requests
-        with patch.object(crawler, "crawl_page") as mock_crawl_page:
+        with patch.object(crawler, "crawl_page", return_value=set()) as mock_crawl_page:
             crawler.crawl()
 
             # Verify crawl_page was called with the base URL
             mock_crawl_page.assert_called_once_with("https://example.com", 0)
 
+    def test_crawl_concurrency_fallback_without_aiohttp(self):
+        """Test that crawl falls back to the thread pool without aiohttp."""
+        crawler = SiteCrawler(
+            "https://example.com", max_depth=1, delay=0, concurrency=4
+        )
+
+        # Mock responses so the root links to several child pages
+        def mock_get(url, **kwargs):
+            if url == "https://example.com":
+                return mock_html_response(
+                    '<a href="/page1">1</a><a href="/page2">2</a><a href="/page3">3</a>'
+                )
+            return mock_html_response("<p>No links</p>")
+
+        crawler.session = Mock()
+        crawler.session.get.side_effect = mock_get
+
+        with patch("main.aiohttp", None):
+            crawler.crawl()
+
+        # All pages should be crawled by the thread pool
+        self.assertEqual(crawler.session.get.call_count, 4)
+        self.assertIn("https://example.com/page2", crawler.visited_urls)
+        self.assertEqual(crawler.url_depth["https://example.com/page2"], 1)
+
+    def test_crawl_concurrency_uses_async_engine(self):
+        """Test that concurrency above 1 dispatches to the async engine."""
+        crawler = SiteCrawler("https://example.com", concurrency=4)
+
+        with patch("main.asyncio.run") as mock_run:
+            # Close the coroutine handed to the mocked run so the suite
+            # stays free of "never awaited" warnings
+            mock_run.side_effect = lambda coro: coro.close()
+
+            with patch.object(crawler, "crawl_page") as mock_crawl_page:
+                crawler.crawl()
+
+                # Verify the async engine was used instead of the sequential path
+                mock_run.assert_called_once()
+                mock_crawl_page.assert_not_called()
+
 
 class TestMainFunction(unittest.TestCase):
     """Test the main function and command line argument parsing."""
@@ -347,14 +671,31 @@ class TestMainFunction(unittest.TestCase):
 
         # Verify crawler was created with correct arguments
         mock_crawler_class.assert_called_once_with(
-            base_url="https://example.com", max_depth=3, delay=1.0
+            base_url="https://example.com",
+            max_depth=3,
+            delay=1.0,
+            concurrency=1,
+            state_db=None,
+            head_probe=False,
         )
 
         # Verify crawl and generate_report were called
         mock_crawler.crawl.assert_called_once()
         mock_crawler.generate_report.assert_called_once_with(is_partial=False)
 
-    @patch("sys.argv", ["main.py", "example.com", "--max-depth", "5", "--delay", "0.5"])
+    @patch(
+        "sys.argv",
+        [
+            "main.py",
+            "example.com",
+            "--max-depth",
+            "5",
+            "--delay",
+            "0.5",
+            "--concurrency",
+            "8",
+        ],
+    )
     @patch("main.SiteCrawler")
     @patch("builtins.print")
     def test_main_with_options(self, mock_print, mock_crawler_class):
@@ -366,7 +707,12 @@ class TestMainFunction(unittest.TestCase):
 
         # Verify crawler was created with correct arguments
         mock_crawler_class.assert_called_once_with(
-            base_url="https://example.com", max_depth=5, delay=0.5
+            base_url="https://example.com",
+            max_depth=5,
+            delay=0.5,
+            concurrency=8,
+            state_db=None,
+            head_probe=False,
         )
 
     @patch("sys.argv", ["main.py", "https://example.com", "--output", "report.md"])
@@ -1,187 +1,275 @@
 """
-Integration tests using HTTP Bin service
+Integration tests using a local HTTP Bin-style server
 
-This test suite uses httpbin.org to test the site crawler with real HTTP responses.
-HTTP Bin provides endpoints that return specific HTTP status codes, which is perfect
-for testing how the crawler handles different response types.
+This test suite runs the site crawler against a small stdlib HTTP server on
+127.0.0.1 that mimics the httpbin.org endpoints the tests need
+(/status/<code>, /html, /json). Serving locally removes DNS, TLS, and
+wide-area round trips, so the suite is fast and does not depend on the
+network being up.
 
 Usage:
     python test_with_httpbin.py
 
-Note: These tests require an internet connection to reach httpbin.org
+Set RUN_NETWORK_TESTS=1 to also run the tests that reach the real
+httpbin.org service.
 """
 
+import functools
+import json
+import os
+import socket
+import threading
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-from main import SiteCrawler
+import requests
+from requests.adapters import HTTPAdapter
 
+from main import SiteCrawler
 
-class TestSiteCrawlerWithHttpBin(unittest.TestCase):
-    """Integration tests using HTTP Bin service."""
+_real_getaddrinfo = socket.getaddrinfo
 
-    def setUp(self):
-        """Set up test fixtures before each test method."""
-        # Use a small delay to be respectful to the HTTP Bin service
-        self.crawler = SiteCrawler("https://httpbin.org", max_depth=1, delay=0)
 
-    def test_http_200_response(self):
-        """Test crawling a page that returns HTTP 200 OK."""
-        url = "https://httpbin.org/status/200"
+@functools.lru_cache(maxsize=32)
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """Memoized socket.getaddrinfo so repeated lookups skip the resolver."""
+    return _real_getaddrinfo(host, port, family, type, proto, flags)
 
-        # Crawl the specific status endpoint
-        self.crawler.crawl_page(url, 0)
 
-        # Verify the page was visited and recorded correctly
-        self.assertIn(url, self.crawler.visited_urls)
-        self.assertEqual(self.crawler.url_status[url], 200)
-        self.assertEqual(self.crawler.url_depth[url], 0)
+# Status codes exercised by the multi-URL tests; frozen once at module
+# scope instead of re-built as lists inside each test (URLs themselves
+# depend on the server's ephemeral port, so they are formed per class)
+_STATUS_CODES = (200, 404, 500, 403)
 
-        # Verify it's not in the error list
-        self.assertNotIn(url, self.crawler.error_urls.get(200, []))
+_HTML_PAGE = (
+    b"<html><head><title>Sample page</title></head><body>"
+    b'<a href="/status/200">ok</a>'
+    b'<a href="/json">data</a>'
+    b"</body></html>"
+)
 
-    def test_http_404_response(self):
-        """Test crawling a page that returns HTTP 404 Not Found."""
-        url = "https://httpbin.org/status/404"
 
-        # Crawl the specific status endpoint
-        self.crawler.crawl_page(url, 0)
+class _HttpBinLikeHandler(BaseHTTPRequestHandler):
+    """Serve the handful of httpbin.org endpoints the tests rely on."""
 
-        # Verify the page was visited and recorded correctly
-        self.assertIn(url, self.crawler.visited_urls)
-        self.assertEqual(self.crawler.url_status[url], 404)
-        self.assertEqual(self.crawler.url_depth[url], 0)
+    def _respond(self, include_body):
+        if self.path.startswith("/status/"):
+            try:
+                code = int(self.path.rsplit("/", 1)[1])
+            except ValueError:
+                code = 404
+            self.send_response(code)
+            if 300 <= code < 400:
+                self.send_header("Location", "/html")
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
 
-        # Verify it's in the error list
-        self.assertIn(url, self.crawler.error_urls[404])
+        if self.path == "/json":
+            body = json.dumps({"slideshow": {"title": "Sample"}}).encode("utf-8")
+            content_type = "application/json"
+        else:
+            # /html, the root page, and anything else serve a small page
+            body = _HTML_PAGE
+            content_type = "text/html; charset=utf-8"
 
-    def test_http_500_response(self):
-        """Test crawling a page that returns HTTP 500 Internal Server Error."""
-        url = "https://httpbin.org/status/500"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
 
-        # Crawl the specific status endpoint
-        self.crawler.crawl_page(url, 0)
+    def do_GET(self):
+        self._respond(include_body=True)
 
-        # Verify the page was visited and recorded correctly
-        self.assertIn(url, self.crawler.visited_urls)
-        self.assertEqual(self.crawler.url_status[url], 500)
-        self.assertEqual(self.crawler.url_depth[url], 0)
+    def do_HEAD(self):
+        self._respond(include_body=False)
 
-        # Verify it's in the error list
-        self.assertIn(url, self.crawler.error_urls[500])
+    def log_message(self, format, *args):
+        """Keep the test output free of per-request server lines."""
 
-    def test_http_403_response(self):
-        """Test crawling a page that returns HTTP 403 Forbidden."""
-        url = "https://httpbin.org/status/403"
 
-        # Crawl the specific status endpoint
-        self.crawler.crawl_page(url, 0)
+class TestSiteCrawlerWithLocalServer(unittest.TestCase):
+    """Integration tests against a local HTTP Bin-style server."""
 
-        # Verify the page was visited and recorded correctly
-        self.assertIn(url, self.crawler.visited_urls)
-        self.assertEqual(self.crawler.url_status[url], 403)
-        self.assertEqual(self.crawler.url_depth[url], 0)
+    @classmethod
+    def setUpClass(cls):
+        """Start the local server and one pooled session for the class.
 
-        # Verify it's in the error list
-        self.assertIn(url, self.crawler.error_urls[403])
+        Keep-alive reuses a single TCP connection for all of the
+        requests in the suite instead of paying handshake costs on each
+        test method.
+        """
+        cls._server = ThreadingHTTPServer(("127.0.0.1", 0), _HttpBinLikeHandler)
+        cls._server_thread = threading.Thread(
+            target=cls._server.serve_forever, daemon=True
+        )
+        cls._server_thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls._server.server_address[1]}"
 
-    def test_http_301_redirect(self):
-        """Test crawling a page that returns HTTP 301 redirect."""
-        url = "https://httpbin.org/status/301"
+        cls._session = requests.Session()
+        cls._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
 
-        # Crawl the specific status endpoint
-        self.crawler.crawl_page(url, 0)
+        # Every test hits the same host, so resolve it once per process
+        # and let the memoized lookup answer the rest
+        socket.getaddrinfo = _cached_getaddrinfo
 
-        # Verify the page was visited and recorded correctly
-        self.assertIn(url, self.crawler.visited_urls)
-        self.assertEqual(self.crawler.url_depth[url], 0)
+        # Probe the server once; if it is down, every test skips
+        # immediately instead of burning a full request timeout each.
+        # The probe doubles as a warm-up that primes the session's
+        # connection pool before the first real test runs.
+        try:
+            response = cls._session.get(cls.base_url + "/status/200", timeout=5)
+            cls._server_ok = response.status_code == 200
+        except requests.exceptions.RequestException:
+            cls._server_ok = False
+
+        # One crawler for the whole class, riding the warmed session; a
+        # tight (connect, read) timeout keeps failing tests from
+        # stalling on the full default budget. setUp resets its crawl
+        # state between tests.
+        cls._crawler = SiteCrawler(
+            cls.base_url, max_depth=1, delay=0, session=cls._session, timeout=(3, 5)
+        )
 
-        # The status could be 200 (if redirect was followed), 301 (if not followed), or 502 (if service issue)
-        status = self.crawler.url_status[url]
-        self.assertIn(status, [200, 301, 502])
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the server, close the session, restore the resolver."""
+        socket.getaddrinfo = _real_getaddrinfo
+        _cached_getaddrinfo.cache_clear()
+        cls._session.close()
+        cls._server.shutdown()
+        cls._server.server_close()
+        cls._server_thread.join(timeout=5)
 
-        # If it's an error status, it should be in error_urls
-        if status >= 400:
-            self.assertIn(url, self.crawler.error_urls[status])
-        else:
-            # Success status should not be in error_urls
-            self.assertNotIn(url, self.crawler.error_urls.get(status, []))
+    def setUp(self):
+        """Reset the shared crawler's state before each test method."""
+        if not self._server_ok:
+            self.skipTest("local test server failed to start")
+
+        # Reuse the class-level crawler so the warmed connection pool
+        # survives between tests; only crawl state is cleared
+        self.crawler = self._crawler
+        self.crawler.visited_urls.clear()
+        self.crawler._rejected_urls.clear()
+        self.crawler.url_status.clear()
+        self.crawler.url_depth.clear()
+        self.crawler.error_urls = {0: [], 404: [], 500: []}
+        self.crawler._sorted_error_codes = None
+        self.crawler.total_requests = 0
+
+    def url(self, path):
+        """Build an absolute URL on the local test server."""
+        return self.base_url + path
+
+    def test_http_status_responses(self):
+        """Test crawling pages across success and error status codes."""
+        # One data-driven pass (418 included for fun); a single shared
+        # crawler and connection serve every case
+        for code in _STATUS_CODES + (418,):
+            with self.subTest(code=code):
+                url = self.url(f"/status/{code}")
+
+                # Crawl the specific status endpoint
+                self.crawler.crawl_page(url, 0)
+
+                # Verify the page was visited and recorded correctly
+                self.assertIn(url, self.crawler.visited_urls)
+                self.assertEqual(self.crawler.url_status[url], code)
+                self.assertEqual(self.crawler.url_depth[url], 0)
+
+                if code >= 400:
+                    # Client and server errors land in the error list
+                    self.assertIn(url, self.crawler.error_urls[code])
+                else:
+                    # Successes must not be recorded as errors
+                    self.assertNotIn(url, self.crawler.error_urls.get(code, []))
 
-    def test_http_302_redirect(self):
-        """Test crawling a page that returns HTTP 302 redirect."""
-        url = "https://httpbin.org/status/302"
+    def test_http_301_redirect(self):
+        """Test crawling a page that returns HTTP 301 redirect."""
+        url = self.url("/status/301")
 
-        # Crawl the specific status endpoint
+        # Crawl the specific status endpoint; the server redirects to
+        # /html and the session follows it
         self.crawler.crawl_page(url, 0)
 
-        # Verify the page was visited and recorded correctly
+        # Verify the page was visited and recorded with the final status
         self.assertIn(url, self.crawler.visited_urls)
+        self.assertEqual(self.crawler.url_status[url], 200)
         self.assertEqual(self.crawler.url_depth[url], 0)
 
-        # The status could be 200 (if redirect was followed), 302 (if not followed), or 502 (if service issue)
-        status = self.crawler.url_status[url]
-        self.assertIn(status, [200, 302, 502])
-
-        # If it's an error status, it should be in error_urls
-        if status >= 400:
-            self.assertIn(url, self.crawler.error_urls[status])
-        else:
-            # Success status should not be in error_urls
-            self.assertNotIn(url, self.crawler.error_urls.get(status, []))
+        # Followed redirects are not errors
+        self.assertNotIn(url, self.crawler.error_urls.get(200, []))
 
-    def test_http_418_teapot(self):
-        """Test crawling a page that returns HTTP 418 I'm a teapot (for fun)."""
-        url = "https://httpbin.org/status/418"
+    def test_http_302_redirect(self):
+        """Test crawling a page that returns HTTP 302 redirect."""
+        url = self.url("/status/302")
 
-        # Crawl the specific status endpoint
+        # Crawl the specific status endpoint; the server redirects to
+        # /html and the session follows it
         self.crawler.crawl_page(url, 0)
 
-        # Verify the page was visited and recorded correctly
+        # Verify the page was visited and recorded with the final status
         self.assertIn(url, self.crawler.visited_urls)
-        self.assertEqual(self.crawler.url_status[url], 418)
+        self.assertEqual(self.crawler.url_status[url], 200)
         self.assertEqual(self.crawler.url_depth[url], 0)
 
-        # 418 is a client error, so it should be in error_urls
-        self.assertIn(url, self.crawler.error_urls[418])
+        # Followed redirects are not errors
+        self.assertNotIn(url, self.crawler.error_urls.get(200, []))
 
     def test_multiple_status_codes(self):
         """Test crawling multiple pages with different status codes."""
-        urls = [
-            "https://httpbin.org/status/200",
-            "https://httpbin.org/status/404",
-            "https://httpbin.org/status/500",
-            "https://httpbin.org/status/403",
-        ]
-
-        # Crawl each URL
-        for url in urls:
-            self.crawler.crawl_page(url, 0)
-            time.sleep(0.1)  # Small delay between requests
+        urls = [self.url(f"/status/{code}") for code in _STATUS_CODES]
+
+        # Crawl the URLs concurrently; each writes disjoint dict keys
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda url: self.crawler.crawl_page(url, 0), urls))
 
         # Verify all URLs were visited
         for url in urls:
             self.assertIn(url, self.crawler.visited_urls)
 
         # Verify status codes were recorded correctly
-        self.assertEqual(self.crawler.url_status["https://httpbin.org/status/200"], 200)
-        self.assertEqual(self.crawler.url_status["https://httpbin.org/status/404"], 404)
-        self.assertEqual(self.crawler.url_status["https://httpbin.org/status/500"], 500)
-        self.assertEqual(self.crawler.url_status["https://httpbin.org/status/403"], 403)
+        self.assertEqual(self.crawler.url_status[self.url("/status/200")], 200)
+        self.assertEqual(self.crawler.url_status[self.url("/status/404")], 404)
+        self.assertEqual(self.crawler.url_status[self.url("/status/500")], 500)
+        self.assertEqual(self.crawler.url_status[self.url("/status/403")], 403)
 
         # Verify error URLs are properly categorized
-        self.assertIn("https://httpbin.org/status/404", self.crawler.error_urls[404])
-        self.assertIn("https://httpbin.org/status/500", self.crawler.error_urls[500])
-        self.assertIn("https://httpbin.org/status/403", self.crawler.error_urls[403])
+        self.assertIn(self.url("/status/404"), self.crawler.error_urls[404])
+        self.assertIn(self.url("/status/500"), self.crawler.error_urls[500])
+        self.assertIn(self.url("/status/403"), self.crawler.error_urls[403])
 
         # Verify successful URLs are not in error list
-        self.assertNotIn(
-            "https://httpbin.org/status/200", self.crawler.error_urls.get(200, [])
-        )
+        self.assertNotIn(self.url("/status/200"), self.crawler.error_urls.get(200, []))
+
+    def test_server_error_with_default_session(self):
+        """Test that a persistent 5xx keeps its status on the default session."""
+        # The shared crawler rides an injected retry-free session, so
+        # this builds one with the crawler's own session to exercise
+        # its retry policy end to end
+        crawler = SiteCrawler(self.base_url, max_depth=1, delay=0, timeout=(3, 5))
+        url = self.url("/status/500")
+
+        try:
+            crawler.crawl_page(url, 0)
+
+            # Retries exhaust but the final 500 is still recorded as a
+            # 500, not as a failed request
+            self.assertEqual(crawler.url_status[url], 500)
+            self.assertIn(url, crawler.error_urls[500])
+            self.assertNotIn(url, crawler.error_urls[0])
+        finally:
+            crawler.session.close()
 
     def test_html_content_extraction(self):
-        """Test extracting links from HTML content returned by HTTP Bin."""
-        # HTTP Bin's /html endpoint returns HTML content
-        url = "https://httpbin.org/html"
+        """Test extracting links from HTML content."""
+        # The /html endpoint returns a page with same-domain links
+        url = self.url("/html")
 
         # Crawl the HTML endpoint
         self.crawler.crawl_page(url, 0)
@@ -190,16 +278,12 @@ class TestSiteCrawlerWithHttpBin(unittest.TestCase):
         self.assertIn(url, self.crawler.visited_urls)
         self.assertEqual(self.crawler.url_status[url], 200)
 
-        # The HTML endpoint should return HTML content that can be parsed
-        # We can't easily test link extraction without knowing the exact content,
-        # but we can verify the page was processed successfully
-
     def test_json_response(self):
-        """Test crawling a JSON endpoint (should be skipped by URL validation)."""
-        url = "https://httpbin.org/json"
+        """Test crawling a JSON endpoint (no links are extracted from it)."""
+        url = self.url("/json")
 
-        # This should be skipped because it's not a typical HTML page
-        # The crawler might still visit it, but it won't extract links from JSON
+        # The crawler visits it, but the non-HTML content type means no
+        # link extraction happens
 
         # Crawl the JSON endpoint
         self.crawler.crawl_page(url, 0)
@@ -208,78 +292,75 @@ class TestSiteCrawlerWithHttpBin(unittest.TestCase):
         self.assertIn(url, self.crawler.visited_urls)
         self.assertEqual(self.crawler.url_status[url], 200)
 
-    def test_report_generation_with_httpbin(self):
-        """Test report generation with real HTTP Bin data."""
+    def test_report_generation_with_real_responses(self):
+        """Test report generation with data from real HTTP responses."""
         # Crawl a few different status codes
-        urls = [
-            "https://httpbin.org/status/200",
-            "https://httpbin.org/status/404",
-            "https://httpbin.org/status/500",
-        ]
+        urls = [self.url(f"/status/{code}") for code in _STATUS_CODES[:3]]
 
-        for url in urls:
-            self.crawler.crawl_page(url, 0)
-            time.sleep(0.1)
+        # Overlap the requests; report generation only needs the final state
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda url: self.crawler.crawl_page(url, 0), urls))
 
         # Generate report
         report = self.crawler.generate_report()
 
         # Verify report contains expected content
-        self.assertIn("Site Crawler Report: https://httpbin.org", report)
+        self.assertIn(f"Site Crawler Report: {self.base_url}", report)
         self.assertIn("Total Pages Visited | 3", report)
         self.assertIn("HTTP 404 ERRORS", report)
         self.assertIn("HTTP 500 ERRORS", report)
-        self.assertIn("https://httpbin.org/status/404", report)
-        self.assertIn("https://httpbin.org/status/500", report)
+        self.assertIn(self.url("/status/404"), report)
+        self.assertIn(self.url("/status/500"), report)
 
     def test_delay_respect(self):
         """Test that the crawler respects the delay between requests."""
-        start_time = time.time()
+        # A crawler with its own delay; the shared one uses delay=0.
+        # The crawler's delay parameter is the single source of pacing,
+        # so the assertion below is derived from it.
+        delay = 0.5
+        crawler = SiteCrawler(
+            self.base_url, max_depth=1, delay=delay, session=self._session
+        )
 
-        # Crawl multiple URLs with a delay
-        urls = [
-            "https://httpbin.org/status/200",
-            "https://httpbin.org/status/404",
-            "https://httpbin.org/status/500",
-        ]
+        urls = [self.url(f"/status/{code}") for code in _STATUS_CODES[:3]]
+
+        start_time = time.time()
 
         for url in urls:
-            self.crawler.crawl_page(url, 0)
+            crawler.crawl_page(url, 0)
 
-        end_time = time.time()
-        elapsed_time = end_time - start_time
+        elapsed_time = time.time() - start_time
 
-        # With 3 requests and 0.5s delay between each, minimum time should be ~1 second
-        # (first request has no delay, then 2 delays of 0.5s each)
-        self.assertGreaterEqual(elapsed_time, 0.8)  # Allow some tolerance
+        # The first request is unpaced; each later same-host request
+        # waits `delay` seconds (small epsilon for clock differences)
+        self.assertGreaterEqual(elapsed_time, (len(urls) - 1) * delay - 0.05)
 
     def test_domain_validation(self):
-        """Test that the crawler only visits URLs from the same domain."""
-        # Try to crawl a URL from a different domain
-        external_url = "https://example.com"
+        """Test that the crawler only follows URLs from the same domain."""
+        # localhost and 127.0.0.1 reach the same server but are
+        # different netlocs, so this URL counts as cross-domain
+        external_url = f"http://localhost:{self._server.server_address[1]}/"
 
-        # This should be visited but the crawler should not follow links from it
-        # The domain validation happens in is_valid_url() which is used for link extraction
+        # The crawler will visit any URL passed to crawl_page directly
         self.crawler.crawl_page(external_url, 0)
 
-        # The URL should be visited (crawler will try to visit any URL passed to crawl_page)
+        # The URL should be visited and succeed against the local server
         self.assertIn(external_url, self.crawler.visited_urls)
+        self.assertEqual(self.crawler.url_status[external_url], 200)
 
-        # Check if it failed or succeeded - either is acceptable for this test
-        # The important thing is that domain validation prevents following links from external domains
-        status = self.crawler.url_status.get(external_url)
-        if status == 0:
-            # Request failed (expected for external domain)
-            self.assertIn(external_url, self.crawler.error_urls.get(0, []))
-        else:
-            # Request succeeded (example.com might be reachable)
-            # But the crawler should not extract links from it due to domain validation
-            pass
+        # But domain validation rejects it, so its links are never followed
+        self.assertFalse(self.crawler.is_valid_url(external_url))
 
     def test_invalid_url_handling(self):
-        """Test handling of invalid URLs."""
-        # Try to crawl a non-existent domain
-        invalid_url = "https://this-domain-does-not-exist-12345.com"
+        """Test handling of unreachable URLs."""
+        # Find a port nothing is listening on, so the connection is
+        # refused immediately rather than timing out
+        probe = socket.socket()
+        probe.bind(("127.0.0.1", 0))
+        unused_port = probe.getsockname()[1]
+        probe.close()
+
+        invalid_url = f"http://127.0.0.1:{unused_port}/"
 
         # This should fail but be handled gracefully
         self.crawler.crawl_page(invalid_url, 0)
@@ -290,13 +371,15 @@ class TestSiteCrawlerWithHttpBin(unittest.TestCase):
         self.assertIn(invalid_url, self.crawler.error_urls[0])
 
 
+@unittest.skipUnless(
+    os.getenv("RUN_NETWORK_TESTS"),
+    "set RUN_NETWORK_TESTS=1 to run tests against the real httpbin.org",
+)
 class TestHttpBinServiceAvailability(unittest.TestCase):
-    """Test to verify HTTP Bin service is available before running integration tests."""
+    """Optional check that the real HTTP Bin service is reachable."""
 
     def test_httpbin_availability(self):
         """Test that HTTP Bin service is reachable."""
-        import requests
-
         try:
             response = requests.get("https://httpbin.org/status/200", timeout=10)
             self.assertEqual(response.status_code, 200)
@@ -305,16 +388,15 @@ class TestHttpBinServiceAvailability(unittest.TestCase):
 
 
 if __name__ == "__main__":
-    # Run the availability test first
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
     suite.addTest(loader.loadTestsFromTestCase(TestHttpBinServiceAvailability))
-    suite.addTest(loader.loadTestsFromTestCase(TestSiteCrawlerWithHttpBin))
+    suite.addTest(loader.loadTestsFromTestCase(TestSiteCrawlerWithLocalServer))
 
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
 
     if result.wasSuccessful():
-        print("\n✅ All HTTP Bin integration tests passed!")
+        print("\n✅ All integration tests passed!")
     else:
         print("\n❌ Some tests failed. Check the output above for details.")